@@ -1,12 +1,11 @@
 # app.py
-import os
-import json
+import os, tempfile, threading, time
+import orjson
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent / "src"))
-import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 
@@ -76,17 +75,73 @@ os.environ["ALLOW_STUBS"] = "true" if allow_stubs else "false"
 os.environ["HTTP_TIMEOUT"] = str(http_timeout)
 
 # ---------- Run ----------
-def run_pipeline(q: str) -> Dict[str, Any]:
+BRIEF_CACHE_TTL = 3600
+
+@st.cache_resource
+def _brief_cache() -> Dict[str, Any]:
+    """Process-wide store of finished briefs: (query, settings) -> (stored_at, brief). Plain data, no Streamlit calls."""
+    return {"lock": threading.Lock(), "items": {}}
+
+def cached_brief(q: str, settings: tuple) -> Dict[str, Any] | None:
+    store = _brief_cache()
+    with store["lock"]:
+        hit = store["items"].get((q, settings))
+    if hit and time.time() - hit[0] < BRIEF_CACHE_TTL:
+        return hit[1]
+    return None
+
+def remember_brief(q: str, settings: tuple, brief: Dict[str, Any]) -> None:
+    # only briefs with sources: an empty one (e.g. a network blip) must not stick for an hour
+    if not brief.get("sources"):
+        return
+    store = _brief_cache()
+    now = time.time()
+    with store["lock"]:
+        items = store["items"]
+        for k in [k for k, (t, _) in items.items() if now - t >= BRIEF_CACHE_TTL]:
+            del items[k]
+        items[(q, settings)] = (now, brief)
+
+def run_pipeline(q: str, on_token: Callable[[str], None] | None = None) -> Dict[str, Any]:
     """
-    Invokes your LangGraph with the current settings/env, returns final state['brief'] dict.
+    Runs your LangGraph with the current settings/env, returns final state['brief'] dict.
+    Writer tokens are passed to on_token as they arrive, so the draft can be shown before the graph ends.
     """
     state_in = {"query": q, "failure_count": 0}
     # If tracing is on and properly configured, callbacks will be populated; otherwise []
     callbacks = get_callbacks()
-    final_state = compiled.invoke(state_in, config={"callbacks": callbacks})
+    final_state: Dict[str, Any] = {}
+    for mode, chunk in compiled.stream(state_in, config={"callbacks": callbacks}, stream_mode=["messages", "values"]):
+        if mode == "values":
+            final_state = chunk
+        elif on_token:
+            msg, meta = chunk
+            if meta.get("langgraph_node") == "writer" and isinstance(msg.content, str) and msg.content:
+                on_token(msg.content)
     brief = final_state.get("brief") or {}
     return brief
 
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write to a unique sibling temp file and swap it in, so readers never see a half-written artifact.
+    Sessions are threads of one process, so the temp name must be unique per call, not per pid."""
+    f = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False)
+    try:
+        with f:
+            f.write(data)
+            # mkstemp creates 0600; keep the artifact's existing mode (0644 for a new one)
+            try:
+                mode = path.stat().st_mode & 0o777
+            except OSError:
+                mode = 0o644
+            os.fchmod(f.fileno(), mode)
+        os.replace(f.name, path)
+    except BaseException:
+        try:
+            os.unlink(f.name)
+        except OSError:
+            pass
+        raise
+
 # ---------- UI Regions ----------
 left, right = st.columns([2, 1])
 
@@ -99,8 +154,20 @@ if run_btn:
         st.write("• Searching & collecting sources")
         st.write("• Extracting facts")
         st.write("• Writing the brief")
+        live = st.empty()
+        draft: List[str] = []
+
+        def _show_token(tok: str) -> None:
+            draft.append(tok)
+            live.markdown("".join(draft))
+
         try:
-            brief = run_pipeline(topic.strip())
+            settings = (max_sources, min_non_empty, llm_mode, tracing_on, allow_stubs, http_timeout)
+            brief = cached_brief(topic.strip(), settings)
+            if brief is None:
+                brief = run_pipeline(topic.strip(), on_token=_show_token)
+                remember_brief(topic.strip(), settings, brief)
+            live.empty()
             status.update(label="Done ", state="complete")
         except Exception as e:
             status.update(label="Error", state="error")
@@ -114,8 +181,14 @@ if run_btn:
     st.write('DEBUG: MIN_NON_EMPTY_SOURCES', os.environ.get('MIN_NON_EMPTY_SOURCES'))
     st.write('DEBUG: LANGSMITH_ENABLED', os.environ.get('LANGSMITH_ENABLED'))
     md = render_markdown_brief(brief)
-    (ARTIFACTS / "brief.md").write_text(md, encoding="utf-8")
-    (ARTIFACTS / "sample_output.json").write_text(json.dumps(brief, indent=2, ensure_ascii=False), encoding="utf-8")
+    # Encode once; the same bytes feed the artifact files and the download buttons
+    md_bytes = md.encode("utf-8")
+    json_bytes = orjson.dumps(brief, option=orjson.OPT_INDENT_2)
+    try:
+        _write_atomic(ARTIFACTS / "brief.md", md_bytes)
+        _write_atomic(ARTIFACTS / "sample_output.json", json_bytes)
+    except OSError as e:
+        st.warning(f"Could not save artifacts: {e}")
 
     # Display the brief
     with left:
@@ -124,7 +197,7 @@ if run_btn:
 
         st.download_button(
             "Download Markdown",
-            data=md.encode("utf-8"),
+            data=md_bytes,
             file_name="brief.md",
             mime="text/markdown",
             use_container_width=True
@@ -132,7 +205,7 @@ if run_btn:
 
         st.download_button(
             "Download JSON",
-            data=json.dumps(brief, indent=2, ensure_ascii=False).encode("utf-8"),
+            data=json_bytes,
             file_name="sample_output.json",
             mime="application/json",
             use_container_width=True
@@ -143,24 +216,22 @@ if run_btn:
         st.subheader("Sources")
         srcs = brief.get("sources") or []
         if srcs:
-            df = pd.DataFrame([{
-                "title": s.get("title",""),
-                "url": s.get("url",""),
-                "published_at": s.get("published_at","")
-            } for s in srcs])
-            st.dataframe(df, use_container_width=True, hide_index=True)
+            st.dataframe({
+                "title": [s.get("title","") for s in srcs],
+                "url": [s.get("url","") for s in srcs],
+                "published_at": [s.get("published_at","") for s in srcs],
+            }, use_container_width=True, hide_index=True)
         else:
             st.info("No sources found.")
 
         st.subheader("Facts")
         facts = brief.get("key_facts") or []
         if facts:
-            df_f = pd.DataFrame([{
-                "fact": f.get("fact",""),
-                "evidence_url": f.get("evidence_url",""),
-                "confidence": f.get("confidence", 0.0),
-            } for f in facts])
-            st.dataframe(df_f, use_container_width=True, hide_index=True)
+            st.dataframe({
+                "fact": [f.get("fact","") for f in facts],
+                "evidence_url": [f.get("evidence_url","") for f in facts],
+                "confidence": [f.get("confidence", 0.0) for f in facts],
+            }, use_container_width=True, hide_index=True)
         else:
             st.info("No extracted facts available.")
 
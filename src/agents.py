@@ -1,173 +1,261 @@
 import os, json, textwrap, traceback, datetime
+import orjson
 from typing import List, Dict
 from .state import validate_facts, validate_brief
 from .guardrails.moderation import basic_moderation
-from .tools.url2md import url_to_markdown
+from .tools.url2md import urls_to_markdown, fetch_many, _jina_reader
+from .tools._http import SESSION, canonical_url
+from .tools._cache import cache_get, cache_set, PAGE_CACHE_TTL, NO_CACHE
 from .tools.search import aggregate_search, enrich_with_content
 from .observability import trace
 # --- Reference summarization helpers ---------------------------------
-import re
-from bs4 import BeautifulSoup
+import re, math, heapq
+from collections import Counter
+from html import unescape
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from functools import lru_cache
+from operator import itemgetter
+from lxml import html as lxhtml
 
-_REF_LINE = re.compile(r"^\s*\d+\.\s*\[(?P<title>[^\]]+)\]\((?P<url>[^)]+)\)\s*$")
-_HEADERS = re.compile(r"(?im)^\s{0,3}#{2,3}\s+references\s*$")  # ## References / ### References
+_WORD_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ0-9']+")
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_BULLET_STRIP = re.compile(r"^\s*(?:[-*•]+|\d+[.)])\s+")  # "- ", "* ", "• ", "1. ", "2) "
+_REF_LINE = re.compile(r"(?m)^[^\S\n]*\d+\.[^\S\n]*\[(?P<title>[^\]\n]+)\]\((?P<url>[^)\n]+)\)[^\S\n]*$")
+# ## References / ### References, up to the next '## ' section that is not another References header
+_REFS_BLOCK = re.compile(r"(?ims)^[^\S\n]{0,3}#{2,3}[^\S\n]+references[^\S\n]*$(?P<body>.*?)(?=^[^\S\n]*##\x20(?!references)|\Z)")
 
 def _extract_links_from_references(md: str) -> list[dict]:
     """Return [{'title':..., 'url':...}, ...] from the References section."""
     if not md: return []
-    lines = md.splitlines()
-    refs_start = None
-    for i, ln in enumerate(lines):
-        if _HEADERS.match(ln):
-            refs_start = i + 1
-            break
-    if refs_start is None:
+    block = _REFS_BLOCK.search(md)
+    if not block:
         return []
-    out = []
-    for ln in lines[refs_start:]:
-        if ln.strip().startswith("## ") and not ln.strip().lower().startswith("## references"):
-            break  # next major section
-        m = _REF_LINE.match(ln)
-        if m:
-            out.append({"title": m.group("title").strip(), "url": m.group("url").strip()})
-    return out
+    return [{"title": m.group("title").strip(), "url": m.group("url").strip()}
+            for m in _REF_LINE.finditer(block.group("body"))]
 
 HTTP_TIMEOUT = 12
+_CHROME_XPATH = "//script|//style|//noscript|//header|//footer|//nav|//form|//aside"
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "16"))
+LLM_WORKERS   = int(os.getenv("LLM_WORKERS", "4"))
+LLM_EXCERPT_SENTENCES = int(os.getenv("LLM_EXCERPT_SENTENCES", "60"))
 
 def _jina_markdown(url: str, timeout: int = HTTP_TIMEOUT) -> str:
-    """
-    Dummy implementation for _jina_markdown.
-    Replace this with the actual markdown extraction logic or import if available.
-    """
-    return ""
+    """Markdown via Jina Reader over the shared keep-alive session; '' on failure."""
+    return _jina_reader(url, timeout=timeout)
+
+_BLOCK_STRIP = re.compile(r"(?is)<!--.*?-->|<(script|style|noscript|header|footer|nav|form|aside)\b.*?</\1\s*>")
+_TAG_STRIP = re.compile(r"<[^>]+>")
+_WS = re.compile(r"\s+")
+
+def _html_to_text_fast(html: str) -> str:
+    """Coarse page text without building a DOM: drop boilerplate blocks, then every tag."""
+    text = _TAG_STRIP.sub(" ", _BLOCK_STRIP.sub(" ", html or ""))
+    return _WS.sub(" ", unescape(text)).strip()
 
 def _fetch_markdownish(url: str, timeout: int = HTTP_TIMEOUT) -> str:
-    """Jina Reader first; fallback to HTML text via BeautifulSoup."""
+    """Jina Reader first (cached by _jina_reader); fallback to HTML text, cached under "page" (see PAGE_CACHE_TTL)."""
+    key = canonical_url(url)
+    cached = cache_get("page", key, PAGE_CACHE_TTL)
+    if cached is not None:
+        return cached
     md = _jina_markdown(url, timeout=timeout)
     if md.strip():
         return md
+    text = _html_text(url, timeout)
+    if text.strip():
+        cache_set("page", key, text)
+    return text
+
+def _html_text(url: str, timeout: int = HTTP_TIMEOUT) -> str:
+    """Page text via regex stripping, then an lxml tree walk; '' on failure."""
     try:
-        import requests
-        _UA = {"User-Agent": "Mozilla/5.0"}
-        r = requests.get(url, headers=_UA, timeout=timeout)
+        r = SESSION.get(url, timeout=timeout)
         r.raise_for_status()
-        soup = BeautifulSoup(r.content, "html.parser")
-        for tag in soup(["script","style","noscript","header","footer","nav","form","aside"]): tag.decompose()
-        text = " ".join(t.strip() for t in soup.stripped_strings)
-        return text
+        # the text only feeds the sentence scorer, so the regex pass is enough for most pages
+        text = _html_to_text_fast(r.text)
+        if len(text) >= 200:
+            return text
+        doc = lxhtml.fromstring(r.content)
+        for el in doc.xpath(_CHROME_XPATH): el.drop_tree()
+        # itertext/split/join all run in C; joining nodes with " " keeps adjacent blocks from fusing words
+        return " ".join(" ".join(doc.itertext()).split())
     except Exception:
         return ""
 
 def _split_sentences(text: str) -> list[str]:
     text = (text or "").replace("\n", " ")
-    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()]
-
-def _score_sentences(text: str) -> list[tuple[float,str]]:
-    WORD_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ0-9']+")
-    STOP = {"the","a","an","and","or","but","if","then","else","when","while","of","to","in","on","for","with",
-            "as","by","from","at","is","it","this","that","these","those","be","been","are","was","were","will",
-            "can","may","might","should","would","could","we","you","they","he","she","i","me","my","our","your",
-            "their","them","his","her","its","about","into","over","under","between","within","per","via","not"}
+    return [s.strip() for s in _SENT_SPLIT.split(text) if s.strip()]
+
+_STOP = frozenset({
+    "the","a","an","and","or","but","if","then","else","when","while","of","to","in","on","for","with",
+    "as","by","from","at","is","it","this","that","these","those","be","been","are","was","were","will",
+    "can","may","might","should","would","could","we","you","they","he","she","i","me","my","our","your",
+    "their","them","his","her","its","about","into","over","under","between","within","per","via","not"})
+
+def _content_tokens(text: str) -> list[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if len(w) > 2 and w not in _STOP]
+
+def _idf(texts: list[str]) -> dict[str,float]:
+    """Smoothed inverse document frequency over a batch of pages (sklearn's formula).
+
+    Terms on every page (cookie banners, "subscribe", site chrome) get weight 1.0; rarer terms more.
+    """
+    df = Counter(chain.from_iterable(set(_content_tokens(t)) for t in texts))
+    n = len(texts)
+    return {w: math.log((1 + n) / (1 + c)) + 1.0 for w, c in df.items()}
+
+def _score_sentences(text: str, idf: dict[str,float] | None = None, top: int | None = None) -> list[tuple[float,int,str]]:
+    """(score, index, sentence) best-first; with `top`, only that many are selected (heap, no full sort)."""
     sents = _split_sentences(text)
     if not sents: return []
-    freqs: dict[str,float] = {}
-    for s in sents:
-        for w in WORD_RE.findall(s.lower()):
-            if w in STOP or len(w) <= 2: continue
-            freqs[w] = freqs.get(w, 0.0) + 1.0
-    if freqs:
-        mx = max(freqs.values())
-        for k in list(freqs.keys()):
-            freqs[k] /= mx
-    scored: list[tuple[float,str]] = []
+    # tokenize each sentence once: (content tokens, total word count)
+    toks_per_sent: list[tuple[list[str],int]] = []
     for s in sents:
-        score = sum(freqs.get(w,0.0) for w in WORD_RE.findall(s.lower()))
-        n = max(1, len(WORD_RE.findall(s)))
+        words = _WORD_RE.findall(s.lower())
+        toks_per_sent.append(([w for w in words if len(w) > 2 and w not in _STOP], len(words)))
+    counts = Counter(chain.from_iterable(toks for toks, _ in toks_per_sent))
+    mx = max(counts.values(), default=1)
+    freqs: dict[str,float] = {w: c / mx for w, c in counts.items()}
+    if idf:
+        freqs = {w: f * idf.get(w, 1.0) for w, f in freqs.items()}
+    scored: list[tuple[float,int,str]] = []
+    for i, (s, (toks, n)) in enumerate(zip(sents, toks_per_sent)):
+        score = sum(map(freqs.__getitem__, toks))
         if n < 8 or n > 40: score *= 0.8
-        scored.append((score, s))
-    scored.sort(key=lambda x: x[0], reverse=True)
+        scored.append((score, i, s))
+    if top is not None and top < len(scored):
+        return heapq.nlargest(top, scored, key=itemgetter(0))
+    scored.sort(key=itemgetter(0), reverse=True)
     return scored
 
-def _summarize_local(text: str, n: int = 5) -> list[str]:
-    ranked = _score_sentences(text)
+def _summarize_local(text: str, n: int = 5, idf: dict[str,float] | None = None) -> list[str]:
+    ranked = _score_sentences(text, idf, top=max(1, n*2))
     if not ranked: return []
-    keep = {s for _, s in ranked[:max(1, n*2)]}
-    out = []
-    for s in _split_sentences(text):
-        if s in keep:
-            out.append(s)
-        if len(out) >= n: break
-    return out
-
-def _summarize_with_llm(llm, text: str, n: int = 5) -> list[str]:
-    """Use your Groq LLM if available; else local extractive."""
+    # best 2n candidates, emitted in document order
+    keep = sorted(ranked, key=itemgetter(1))
+    return [s for _, _, s in keep[:n]]
+
+def _summarize_with_llm(llm, text: str, n: int = 5, idf: dict[str,float] | None = None) -> list[str]:
+    """Use your Groq LLM if available; else local extractive (idf-weighted when given)."""
     if isinstance(llm, StubLLM):
-        return _summarize_local(text, n)
+        return _summarize_local(text, n, idf)
+    # send only the locally top-ranked sentences (in page order), not the raw page
+    top = sorted(_score_sentences(text or "", idf, top=LLM_EXCERPT_SENTENCES), key=itemgetter(1))
+    excerpt = "\n".join(s for _, _, s in top)
     prompt = (
         "Summarize the following page into concise bullet points "
         f"(max {n}). Focus on concrete findings, numbers, names, guidance.\n\n"
-        "TEXT:\n" + (text or "")[:120000]
+        "TEXT:\n" + excerpt[:120000]
     )
     try:
         resp = llm.invoke(prompt)
         msg = getattr(resp, "content", "") or ""
-        bullets = [re.sub(r"^[\\-\\d\\.\\)\\s]+","",ln).strip() for ln in msg.splitlines() if ln.strip()]
-        return [b for b in bullets if b][:n] or _summarize_local(text, n)
+        # lazily strip markers and stop once n bullets are in hand
+        bullets = (b for b in (_BULLET_STRIP.sub("", ln).strip() for ln in msg.splitlines()) if b)
+        return list(islice(bullets, n)) or _summarize_local(text, n, idf)
     except Exception:
-        return _summarize_local(text, n)
+        return _summarize_local(text, n, idf)
 
-def _append_reference_summaries(md: str, llm, max_points: int = 5) -> str:
-    """Build '## Reference Summaries' from links in '## References'."""
+def _append_reference_summaries(md: str, llm, max_points: int = 5, fetched: dict[str,str] | None = None) -> str:
+    """Build '## Reference Summaries' from links in '## References'; `fetched` maps url -> page text already in hand."""
     links = _extract_links_from_references(md)
     if not links:
         return md
+    fetched = fetched or {}
+    urls = [it["url"] for it in links]
+    missing = [u for u in urls if not fetched.get(u, "").strip()]
+    got = dict(zip(missing, fetch_many(_fetch_markdownish, missing, FETCH_WORKERS)))
+    bodies = [fetched.get(u) or got.get(u, "") for u in urls]
+    # weight terms against the whole batch so boilerplate shared by every page ranks low
+    pages = [b for b in bodies if b.strip()]
+    idf = _idf(pages) if len(pages) > 1 else None
+
+    def summarize(body: str) -> list[str] | None:
+        return _summarize_with_llm(llm, body, n=max_points, idf=idf) if body.strip() else None
+
+    # LLM calls overlap too, but with a smaller pool to stay under Groq rate limits
+    with ThreadPoolExecutor(max_workers=max(1, LLM_WORKERS)) as ex:
+        summaries = list(ex.map(summarize, bodies))
     sections = ["## Reference Summaries"]
-    for i, it in enumerate(links, 1):
+    for i, (it, bullets) in enumerate(zip(links, summaries), 1):
         url = it["url"]; title = it.get("title") or url
-        body = _fetch_markdownish(url)
-        if not body.strip():
+        if bullets is None:
             sections.append(f"### {i}. {title}\n- (Content unavailable)\n")
             continue
-        bullets = _summarize_with_llm(llm, body, n=max_points)
         sections.append(f"### {i}. {title}\n" + "\n".join(f"- {b}" for b in bullets) + "\n")
     # Append just before the next top-level section after References, else at end
     return md.rstrip() + "\n\n" + "\n".join(sections) + "\n"
 
 LLM_MODE   = os.getenv("LLM_MODE", "groq").lower()
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+# NO_CACHE=1 switches this off too, along with the disk caches in tools/_cache.py
+LLM_CACHE  = not NO_CACHE and os.getenv("LLM_CACHE", "true").lower() in ("1","true","yes","on")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "artifacts/llm_cache.sqlite")
+
+ChatGroq = None
+if LLM_MODE == "groq":
+    try:
+        from langchain_groq import ChatGroq
+    except Exception:
+        pass  # get_llm falls back to StubLLM
 
 class StubLLM:
     def invoke(self, prompt: str):
-        class R: 
+        class R:
             def __init__(self, text): self.content = text
         lines = [ln.strip() for ln in prompt.splitlines() if ln.strip()][:28]
         return R("\n".join(lines) + "\n\n(Stub summary)")
 
+def _install_llm_cache() -> None:
+    """Cache LLM responses (keyed on model + prompt) so re-runs over the same pages skip Groq."""
+    if not LLM_CACHE:
+        return
+    try:
+        from langchain_core.globals import set_llm_cache
+    except Exception:
+        return
+    try:
+        from langchain_community.cache import SQLiteCache
+        os.makedirs(os.path.dirname(LLM_CACHE_PATH) or ".", exist_ok=True)
+        set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+    except Exception:
+        from langchain_core.caches import InMemoryCache
+        set_llm_cache(InMemoryCache())
+
+@lru_cache(maxsize=1)
 def get_llm():
-    if LLM_MODE == "groq" and os.getenv("GROQ_API_KEY"):
+    """Process-wide LLM client; the Groq client and its HTTP pool are built once per worker."""
+    if ChatGroq is not None and os.getenv("GROQ_API_KEY"):
         try:
-            from langchain_groq import ChatGroq
-            return ChatGroq(model_name=GROQ_MODEL, temperature=0.2)
+            _install_llm_cache()
+            # temperature 0 keeps responses deterministic, so cached answers stay valid
+            return ChatGroq(model_name=GROQ_MODEL, temperature=0.0)
         except Exception:
             pass
     return StubLLM()
 
 # ---------- Researcher ----------
-def _score_result(q_terms: List[str], it: Dict) -> float:
+@lru_cache(maxsize=1024)
+def _parse_iso(dt: str | None) -> float | None:
+    """Epoch seconds for an ISO timestamp (trailing 'Z' allowed); None if missing or unparseable."""
+    if not dt:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(dt.replace("Z","+00:00")).timestamp()
+    except Exception:
+        return None
+
+def _score_result(q_terms: tuple[str, ...], it: Dict, now_ts: float | None = None) -> float:
     text = (it.get("title","") + " " + it.get("description","")).lower()
-    term_hits = sum(1 for t in q_terms if t in text)
+    term_hits = sum(map(text.__contains__, q_terms))
     # Recency boost if published_at present
     recency = 0.0
-    dt = it.get("published_at")
-    if dt:
-        try:
-            # handle isoformats
-            d = datetime.datetime.fromisoformat(dt.replace("Z","+00:00")).timestamp()
-            now = datetime.datetime.now(datetime.timezone.utc).timestamp()
-            age_days = max(1.0, (now - d) / 86400)
-            recency = 1.0 / age_days  # newer => bigger
-        except Exception:
-            pass
+    d = _parse_iso(it.get("published_at"))
+    if d is not None:
+        now = now_ts if now_ts is not None else datetime.datetime.now(datetime.timezone.utc).timestamp()
+        age_days = max(1.0, (now - d) / 86400)
+        recency = 1.0 / age_days  # newer => bigger
     return term_hits + 0.1 * recency
 
 def run_researcher(search_fn, enrich_fn, query: str, max_sources: int, min_non_empty: int) -> List[Dict]:
@@ -175,8 +263,11 @@ def run_researcher(search_fn, enrich_fn, query: str, max_sources: int, min_non_e
         try:
             raw = search_fn(query, max_results=max_sources * 3)  # collect wider
             enriched = enrich_fn(raw)
-            q_terms = [t for t in query.lower().split() if len(t) > 2]
-            enriched.sort(key=lambda it: _score_result(q_terms, it), reverse=True)
+            # unique terms only: a word repeated in the query should not double its weight or its scan
+            q_terms = tuple(dict.fromkeys(t for t in query.lower().split() if len(t) > 2))
+            # one clock read for the whole ranking pass instead of one per dated result
+            now_ts = datetime.datetime.now(datetime.timezone.utc).timestamp()
+            enriched.sort(key=lambda it: _score_result(q_terms, it, now_ts), reverse=True)
             # keep unique domains first
             seen_domains, chosen = set(), []
             for it in enriched:
@@ -194,27 +285,64 @@ def run_researcher(search_fn, enrich_fn, query: str, max_sources: int, min_non_e
             return []
 
 # ---------- Analyst ----------
-def _facts_prompt(query: str, sources: List[Dict]) -> str:
-    snippets = []
-    for i, s in enumerate(sources[:8], 1):
-        t = s.get("title") or s.get("url","")
-        u = s.get("url","")
-        c = (s.get("description") or s.get("content") or "")[:900]
-        snippets.append(f"{i}) {t}\nURL: {u}\n{c}")
-    return textwrap.dedent(f"""\
+# Prompt templates are dedented once at import; callers only .format() them
+_FACTS_TMPL = textwrap.dedent("""\
     You are a precise market analyst. From the source snippets below, extract 6 concise facts about **{query}**.
     Each fact MUST include an "evidence_url" from the provided URLs and a numeric "confidence" 0-1.
-    Return ONLY valid JSON list: [{{"fact":"...", "evidence_url":"...", "confidence":0.7}}, ...].
+    Return ONLY a valid JSON object: {{"facts": [{{"fact":"...", "evidence_url":"...", "confidence":0.7}}, ...]}}.
 
     SOURCE SNIPPETS:
-    {os.linesep*2}{os.linesep.join(snippets)}
+
+    {snippets}
     """)
 
+def _facts_prompt(query: str, sources: List[Dict]) -> str:
+    # hashable (title, url, excerpt) key so identical re-runs reuse the built prompt
+    snippets = tuple((s.get("title") or s.get("url",""), s.get("url",""),
+                      (s.get("description") or s.get("content") or "")[:900]) for s in sources[:8])
+    return _facts_prompt_cached(query, snippets)
+
+@lru_cache(maxsize=32)
+def _facts_prompt_cached(query: str, snippet_rows: tuple) -> str:
+    snippets = "\n".join(f"{i}) {t}\nURL: {u}\n{c}" for i, (t, u, c) in enumerate(snippet_rows, 1))
+    return _FACTS_TMPL.format(query=query, snippets=snippets)
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _parse_json_list_maybe(text: str) -> List[Dict]:
+    """Pull the first JSON list of objects out of LLM output, tolerating prose or ``` fences.
+
+    Candidates are located with str.find and decoded in place, so this stays linear (no regex backtracking).
+    """
+    text = text or ""
+    try:
+        data = orjson.loads(text)  # fast path: JSON-mode reply {"facts": [...]} or a bare list
+        if isinstance(data, dict):
+            data = data.get("facts")
+        if isinstance(data, list) and all(isinstance(x, dict) for x in data):
+            return data
+    except orjson.JSONDecodeError:
+        pass
+    start = text.find("[")
+    while start != -1:
+        try:
+            data, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(data, list) and all(isinstance(x, dict) for x in data):
+                return data
+        except ValueError:
+            pass
+        start = text.find("[", start + 1)
+    raise ValueError("LLM output does not contain a JSON list of objects")
+
+def _json_mode(llm):
+    """Ask the provider for a syntactically valid JSON object when the client supports it (StubLLM doesn't)."""
+    return llm.bind(response_format={"type": "json_object"}) if hasattr(llm, "bind") else llm
+
 def run_analyst(llm, query: str, sources: List[Dict]) -> List[Dict]:
     with trace("analyst"):
         try:
-            resp = llm.invoke(_facts_prompt(query, sources)).content
-            facts = json.loads(resp)
+            resp = _json_mode(llm).invoke(_facts_prompt(query, sources)).content
+            facts = _parse_json_list_maybe(resp)
         except Exception:
             fallback_url = (sources[0].get("url") if sources else "https://example.com")
             facts = [{"fact": f"Market for {query} shows active ecosystem of tools and protocols.",
@@ -224,8 +352,7 @@ def run_analyst(llm, query: str, sources: List[Dict]) -> List[Dict]:
         return facts
 
 # ---------- Writer ----------
-def _writer_prompt(query: str, source_sections_md: str, facts_json: str) -> str:
-    return textwrap.dedent(f"""\
+_WRITER_TMPL = textwrap.dedent("""\
     Create a decision-ready market brief on **{query}** using ONLY the material in the sections below.
     Structure:
     - Executive Summary (≤ 6 sentences)
@@ -245,6 +372,26 @@ def _writer_prompt(query: str, source_sections_md: str, facts_json: str) -> str:
     Return pure Markdown, no extra JSON.
     """)
 
+def _writer_prompt(query: str, source_sections_md: str, facts_json: str) -> str:
+    return _WRITER_TMPL.format(query=query, source_sections_md=source_sections_md, facts_json=facts_json)
+
+def _cap_lines(md: str, n: int) -> str:
+    """First n lines of md, located with str.find so long pages are never split into a full line list."""
+    if not md or n <= 0:
+        return ""
+    idx = 0
+    for _ in range(n):
+        j = md.find("\n", idx)
+        if j < 0:
+            return md
+        idx = j + 1
+    return md[:idx - 1]
+
+def _prefetched_content(s: Dict) -> str:
+    """Page text attached upstream, or '' when 'content' is just the search snippet copied over."""
+    pre = s.get("content") or ""
+    return pre if pre.strip() and pre != (s.get("description") or "") else ""
+
 def run_writer(llm, query: str, facts: List[Dict], sources: List[Dict]) -> Dict:
     with trace("writer"):
         if not basic_moderation(query):
@@ -253,21 +400,24 @@ def run_writer(llm, query: str, facts: List[Dict], sources: List[Dict]) -> Dict:
             md = f"# Research Brief: {query}\n\n_No sources found._\n"
             return {"topic": query, "summary": md, "key_facts": facts, "sources": [], "_markdown": md}
 
-        # Convert each URL to contextual markdown
+        # Convert each URL to contextual markdown (fetched concurrently, kept in source order)
+        picked = [(idx, s) for idx, s in enumerate(sources[:10], 1) if s.get("url")]
+        # reuse page text an enrichment step already attached; only fetch the rest
+        pre = [_prefetched_content(s) for _, s in picked]
+        fetched = iter(urls_to_markdown([s["url"] for (_, s), p in zip(picked, pre) if not p], concurrency=FETCH_WORKERS))
+        pages = [p or next(fetched) for p in pre]
         sections = []
         live_sources = []
-        for idx, s in enumerate(sources[:10], 1):
-            url = s.get("url"); title = s.get("title") or url
-            if not url: continue
-            try:
-                md = url_to_markdown(url)
-            except Exception:
-                md = ""
-            md_excerpt = "\n".join(md.splitlines()[:160])
+        fetched_map: dict[str,str] = {}
+        for (idx, s), md in zip(picked, pages):
+            url = s["url"]; title = s.get("title") or url
+            if md.strip() and not md.startswith("# Unable to convert"):
+                fetched_map[url] = md
+            md_excerpt = _cap_lines(md, 160)
             sections.append(f"#### [{idx}] {title}\n{md_excerpt}\n")
             live_sources.append({"title": title, "url": url, "published_at": s.get("published_at")})
 
-        facts_json = json.dumps(facts, ensure_ascii=False, indent=2)
+        facts_json = orjson.dumps(facts, option=orjson.OPT_INDENT_2).decode()
         source_sections_md = "\n\n---\n\n".join(sections)
         try:
             draft = llm.invoke(_writer_prompt(query, source_sections_md, facts_json)).content
@@ -278,7 +428,7 @@ def run_writer(llm, query: str, facts: List[Dict], sources: List[Dict]) -> Dict:
         md_final = f"{draft}\n\n## References\n{refs}\n"
 
         # NEW: summarize each reference and append a section
-        md_final = _append_reference_summaries(md_final, llm, max_points=5)
+        md_final = _append_reference_summaries(md_final, llm, max_points=5, fetched=fetched_map)
 
         brief = {"topic": query, "summary": (draft or "")[:1500], "key_facts": facts, "sources": live_sources, "_markdown": md_final}
         _ = validate_brief(brief)
@@ -1,17 +1,32 @@
-from time import sleep
+from time import sleep, monotonic
 from typing import Callable, Any
 import random
 
-def with_retries(tool_fn: Callable[..., Any], *, attempts: int = 3, base_sleep: float = 0.5):
+def _retryable(exc: Exception) -> bool:
+    """HTTP errors are retried only for 429/5xx; other 4xx won't change on retry. Anything else (timeouts, resets) is."""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+def retryable_status(exc: Exception) -> bool:
+    """Only HTTP errors carrying 429/5xx; for callers whose transport already retries connection errors."""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+def with_retries(tool_fn: Callable[..., Any], *, attempts: int = 3, base_sleep: float = 0.5, max_total: float | None = None,
+                 retry_on: Callable[[Exception], bool] = _retryable):
     def wrapper(*args, **kwargs):
-        last_exc = None
+        deadline = None if max_total is None else monotonic() + max_total
         for i in range(attempts):
             try:
                 return tool_fn(*args, **kwargs)
             except Exception as e:
-                last_exc = e
-                sleep(base_sleep * (2 ** i) + random.random() * 0.2)
-        raise last_exc
+                if i == attempts - 1 or not retry_on(e):
+                    raise
+                # full multiplicative jitter so concurrent callers don't retry in lockstep
+                delay = base_sleep * (2 ** i) * random.uniform(0.5, 1.5)
+                if deadline is not None and monotonic() + delay > deadline:
+                    raise
+                sleep(delay)
     return wrapper
 
 def circuit_broken(failure_count: int, limit: int) -> bool:
@@ -1,9 +1,8 @@
 import re
 TOXIC_PATTERNS = [r"(?i)\bkill\b", r"(?i)\bhate\b", r"(?i)\bslur\b"]
+# one alternation, one scan of the text however many patterns there are
+_TOXIC_RE = re.compile("|".join(f"(?:{pat.removeprefix('(?i)')})" for pat in TOXIC_PATTERNS), re.IGNORECASE)
 def basic_moderation(text: str) -> bool:
     if not text:
         return True
-    for pat in TOXIC_PATTERNS:
-        if re.search(pat, text):
-            return False
-    return True
+    return _TOXIC_RE.search(text) is None
@@ -1,7 +1,7 @@
 import os
 from typing import List, Any
 from contextlib import contextmanager
-import json, time, pathlib
+import atexit, json, time, pathlib, threading
 
 TRACE_DIR = pathlib.Path(os.getenv("TRACE_DIR", "artifacts"))
 
@@ -28,6 +28,19 @@ def get_callbacks() -> List[Any]:
     except Exception:
         return []
 
+TRACE_DISABLED = _bool_env("TRACE_DISABLED", False)
+_TRACE_LOCK = threading.Lock()
+_TRACE_FP = None
+
+def _trace_fp():
+    """trace.jsonl opened once with an 8 KiB buffer; closed (and flushed) at exit."""
+    global _TRACE_FP
+    if _TRACE_FP is None:
+        TRACE_DIR.mkdir(parents=True, exist_ok=True)
+        _TRACE_FP = (TRACE_DIR / "trace.jsonl").open("a", encoding="utf-8", buffering=8192)
+        atexit.register(_TRACE_FP.close)
+    return _TRACE_FP
+
 @contextmanager
 def trace(name: str, meta: dict | None = None):
     t0 = time.time()
@@ -35,10 +48,11 @@ def trace(name: str, meta: dict | None = None):
         yield
     finally:
         t1 = time.time()
-        try:
-            TRACE_DIR.mkdir(parents=True, exist_ok=True)
-            with (TRACE_DIR / "trace.jsonl").open("a", encoding="utf-8") as f:
-                f.write(json.dumps({"span": name, "meta": meta or {}, "start_s": t0, "end_s": t1, "dur_ms": int(1000*(t1-t0))}) + "\n")
-        except Exception:
-            pass
+        if not TRACE_DISABLED:
+            try:
+                line = json.dumps({"span": name, "meta": meta or {}, "start_s": t0, "end_s": t1, "dur_ms": int(1000*(t1-t0))}) + "\n"
+                with _TRACE_LOCK:
+                    _trace_fp().write(line)
+            except Exception:
+                pass
         print(f"[trace] {name} took {int(1000*(t1-t0))}ms")
\ No newline at end of file
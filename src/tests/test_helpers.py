@@ -0,0 +1,114 @@
+import pytest
+import requests
+from src import fallbacks
+from src.agents import _parse_json_list_maybe
+from src.tools import _cache, search
+from src.tools._http import canonical_url
+from src.tools.search import _Deduper
+from src.tools.url2md import fetch_many
+
+def test_canonical_url_normalizes_host_port_and_query():
+    assert canonical_url("HTTPS://Example.COM:443/a?b=2&a=1&utm_source=x#frag") == "https://example.com/a?a=1&b=2"
+    assert canonical_url("http://x/?b=2&a=1&fbclid=z") == canonical_url("http://x/?a=1&b=2")
+    assert canonical_url("https://h.com/%7Euser/index.html") == "https://h.com/~user/"
+
+def test_canonical_url_keeps_a_fetchable_url():
+    assert canonical_url("http://[::1]:8080/x") == "http://[::1]:8080/x"
+    assert canonical_url("http://[::1]:80/x") == "http://[::1]/x"
+    assert canonical_url("https://user:pw@Ex.com:8443/p") == "https://user:pw@ex.com:8443/p"
+    assert canonical_url("not a url") == "not a url"
+
+def test_deduper_keeps_priority_order_and_reports_full():
+    d = _Deduper(2)
+    assert not d.add([{"title": "A", "url": "https://x.com/?utm_source=t"}, {"title": "a", "url": "https://X.com/"}])
+    assert d.add([{"title": "B", "url": ""}, {"title": "B", "url": "https://b.com"}, {"title": "C", "url": "https://c.com"}])
+    assert [it["url"] for it in d.out] == ["https://x.com/", "https://b.com/"]
+
+def test_parse_json_list_maybe_accepts_json_mode_bare_and_fenced_lists():
+    assert _parse_json_list_maybe('{"facts": [{"fact": "abc"}]}') == [{"fact": "abc"}]
+    assert _parse_json_list_maybe('[{"fact": "abc"}]') == [{"fact": "abc"}]
+    assert _parse_json_list_maybe('Here you go:\n```json\n[{"fact": "x [1]"}]\n```') == [{"fact": "x [1]"}]
+
+def test_parse_json_list_maybe_rejects_non_object_lists():
+    with pytest.raises(ValueError):
+        _parse_json_list_maybe("[1, 2] and no facts")
+
+def test_cache_round_trip_ttl_and_memory_layer(tmp_path, monkeypatch):
+    monkeypatch.setattr(_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(_cache, "_MEM", type(_cache._MEM)())
+    monkeypatch.setattr(_cache, "_mem_chars", 0)
+    _cache.cache_set("ns", "k", "value")
+    assert _cache.cache_get("ns", "k", 60) == "value"
+    assert _cache.cache_get("ns", "k", 0) is None
+    assert _cache.cache_get("ns", "missing", 60) is None
+    _cache._MEM.clear(); _cache._mem_chars = 0  # served from disk, then promoted back into memory
+    assert _cache.cache_get("ns", "k", 60) == "value"
+    assert ("ns", "k") in _cache._MEM
+
+def test_memory_cache_is_bounded_by_total_characters(tmp_path, monkeypatch):
+    monkeypatch.setattr(_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(_cache, "_MEM", type(_cache._MEM)())
+    monkeypatch.setattr(_cache, "_mem_chars", 0)
+    monkeypatch.setattr(_cache, "MEM_CACHE_CHARS", 800)
+    for i in range(10):
+        _cache.cache_set("ns", str(i), "x" * 100)
+    assert list(k for _, k in _cache._MEM) == [str(i) for i in range(2, 10)]
+    assert _cache._mem_chars == 800
+    _cache.cache_set("ns", "big", "x" * 101)  # over MEM_CACHE_CHARS // 8: disk only
+    assert ("ns", "big") not in _cache._MEM
+    assert _cache.cache_get("ns", "big", 60) == "x" * 101
+
+def test_ttl_cached_keeps_the_wrapped_default(monkeypatch):
+    monkeypatch.setattr(search, "cache_get", lambda *a: None)
+    monkeypatch.setattr(search, "cache_set", lambda *a: None)
+    seen = []
+    @search._ttl_cached
+    def provider(query: str, max_results: int = 6):
+        seen.append(max_results)
+        return []
+    provider("q"); provider("q", 3); provider(query="q", max_results=4)
+    assert seen == [6, 3, 4]
+
+def test_breaker_lets_one_probe_through_after_cooldown(monkeypatch):
+    monkeypatch.setattr(search, "_BREAKER", {})
+    monkeypatch.setattr(search, "CIRCUIT_BREAKER_COOLDOWN", 0.0)
+    for _ in range(search.CIRCUIT_BREAKER_LIMIT):
+        assert not search._breaker_open("p")
+        search._breaker_record("p", ok=False)
+    monkeypatch.setattr(search, "CIRCUIT_BREAKER_COOLDOWN", 60.0)
+    assert not search._breaker_open("p")  # the probe
+    assert search._breaker_open("p")      # callers queued behind it
+    search._breaker_record("p", ok=True)
+    assert not search._breaker_open("p")
+
+def test_with_retries_retries_429_5xx_but_not_other_4xx(monkeypatch):
+    monkeypatch.setattr(fallbacks, "sleep", lambda s: None)
+    def failing(status):
+        calls = []
+        def fn():
+            calls.append(1)
+            r = requests.Response(); r.status_code = status
+            raise requests.HTTPError(response=r)
+        return fn, calls
+    for status, expected in [(503, 3), (429, 3), (404, 1)]:
+        fn, calls = failing(status)
+        with pytest.raises(requests.HTTPError):
+            fallbacks.with_retries(fn, attempts=3)()
+        assert len(calls) == expected
+    calls = []
+    def refused():
+        calls.append(1)
+        raise requests.ConnectionError("refused")
+    with pytest.raises(requests.ConnectionError):
+        fallbacks.with_retries(refused, attempts=3, retry_on=fallbacks.retryable_status)()
+    assert len(calls) == 1
+
+def test_fetch_many_fetches_each_canonical_url_once_in_input_order():
+    calls = []
+    def fetch(u):
+        calls.append(u)
+        return u.upper()
+    urls = ["https://a.com/x", "https://b.com/", "https://A.com/x?utm_source=t"]
+    assert fetch_many(fetch, urls, 4) == ["HTTPS://A.COM/X", "HTTPS://B.COM/", "HTTPS://A.COM/X"]
+    assert sorted(calls) == ["https://a.com/x", "https://b.com/"]
+    assert fetch_many(fetch, [], 4) == []
@@ -0,0 +1,66 @@
+import os, time, hashlib, tempfile, threading, pathlib
+from collections import OrderedDict
+
+CACHE_DIR = pathlib.Path(os.getenv("CACHE_DIR") or pathlib.Path(tempfile.gettempdir()) / "infootter_cache")
+NO_CACHE = os.getenv("NO_CACHE", "").lower() in ("1","true","yes","on")
+PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", str(7 * 86400)))
+MEM_CACHE_SIZE = int(os.getenv("MEM_CACHE_SIZE", "512"))
+# values are whole pages, so the entry count alone doesn't bound memory; also cap the total characters held
+MEM_CACHE_CHARS = int(os.getenv("MEM_CACHE_CHARS", str(32_000_000)))
+
+# in-process LRU in front of the disk: (namespace, key) -> (stored_at, value)
+_MEM: OrderedDict[tuple[str,str], tuple[float,str]] = OrderedDict()
+_MEM_LOCK = threading.Lock()
+_mem_chars = 0
+
+def _mem_put(k: tuple[str,str], stored_at: float, value: str) -> None:
+    global _mem_chars
+    # oversized values would evict everything else, so they are served from disk only
+    if MEM_CACHE_SIZE <= 0 or len(value) > MEM_CACHE_CHARS // 8:
+        return
+    with _MEM_LOCK:
+        old = _MEM.pop(k, None)
+        if old is not None:
+            _mem_chars -= len(old[1])
+        _MEM[k] = (stored_at, value)
+        _mem_chars += len(value)
+        while len(_MEM) > MEM_CACHE_SIZE or _mem_chars > MEM_CACHE_CHARS:
+            _mem_chars -= len(_MEM.popitem(last=False)[1][1])
+
+def _path(namespace: str, key: str) -> pathlib.Path:
+    return CACHE_DIR / namespace / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".txt")
+
+def cache_get(namespace: str, key: str, ttl_seconds: int) -> str | None:
+    """Return the cached text if it is younger than ttl_seconds; None on miss/expiry or ttl <= 0."""
+    if NO_CACHE or ttl_seconds <= 0:
+        return None
+    k, now = (namespace, key), time.time()
+    with _MEM_LOCK:
+        hit = _MEM.get(k)
+        if hit is not None and now - hit[0] <= ttl_seconds:
+            _MEM.move_to_end(k)
+            return hit[1]
+    p = _path(namespace, key)
+    try:
+        mtime = p.stat().st_mtime
+        if now - mtime > ttl_seconds:
+            return None
+        value = p.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    _mem_put(k, mtime, value)
+    return value
+
+def cache_set(namespace: str, key: str, value: str) -> None:
+    if NO_CACHE:
+        return
+    _mem_put((namespace, key), time.time(), value)
+    p = _path(namespace, key)
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so concurrent fetchers never read a half-written file
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(value, encoding="utf-8")
+        os.replace(tmp, p)
+    except OSError:
+        pass
@@ -0,0 +1,57 @@
+import re, requests
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def _make_session() -> requests.Session:
+    """One keep-alive pool shared by every provider and fetcher, so repeat hosts skip the TCP/TLS handshake."""
+    s = requests.Session()
+    # Accept-Encoding is left to urllib3, which adds br/zstd itself when brotli/zstandard are installed
+    s.headers.update({"User-Agent": "Mozilla/5.0"})
+    # connection setup failures only (never POST, which can be billed): a read timeout means the host
+    # accepted and hung, so retrying would just wait out the timeout again. Status codes (429/5xx) are
+    # left to the caller's own retry layer, e.g. url2md._jina_get.
+    retry = Retry(total=2, connect=2, read=False, backoff_factor=0.3, status_forcelist=())
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+SESSION = _make_session()
+
+def _make_h2_client():
+    """HTTP/2 client for hosts we hit many times concurrently: requests multiplex over one TLS connection.
+    ALPN falls back to HTTP/1.1 per host on its own; None when httpx/h2 aren't installed (use SESSION)."""
+    try:
+        import httpx, h2  # noqa: F401
+    except Exception:
+        return None
+    # with an explicit transport httpx ignores the Client's http2/limits, so they live on the transport
+    transport = httpx.HTTPTransport(http2=True, retries=2,
+                                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32))
+    return httpx.Client(headers=dict(SESSION.headers), transport=transport)
+
+H2_CLIENT = _make_h2_client()
+
+_TRACKING = re.compile(r"^(utm_.*|fbclid|gclid|mc_cid|mc_eid|ref|_hsenc|_hsmi)$", re.I)
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+def canonical_url(url: str) -> str:
+    """Cache/dedup key for a URL: lowercase scheme and host, no default port, no tracking params,
+    sorted query, no fragment, '/index.html' collapsed and '%7E' decoded to '~'."""
+    try:
+        parts = urlsplit((url or "").strip())
+        port = parts.port
+    except ValueError:
+        return (url or "").strip()
+    scheme = parts.scheme.lower()
+    # rebuild from the raw netloc so IPv6 brackets and user:password survive; only the host is lowercased
+    userinfo, at, hostport = parts.netloc.rpartition("@")
+    if port is not None and str(port) == _DEFAULT_PORTS.get(scheme):
+        hostport = hostport[:hostport.rfind(":")]
+    netloc = f"{userinfo}{at}{hostport.lower()}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING.match(k)))
+    path = parts.path.replace("%7E", "~").replace("%7e", "~")
+    if path.endswith("/index.html"):
+        path = path[:-len("index.html")]
+    return urlunsplit((scheme, netloc, path or "/", query, ""))
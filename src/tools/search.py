@@ -1,51 +1,111 @@
-import os, re, time, requests
+import os, re, time, inspect, threading, orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
 from typing import List, Dict, Tuple
-from urllib.parse import urlencode
+from urllib.parse import urlencode, unquote, urlparse
 from bs4 import BeautifulSoup  # add to requirements if missing
+try:
+    from xxhash import xxh3_64_intdigest as _xxh3
+except Exception:
+    _xxh3 = None
+try:
+    from ddgs import DDGS
+except Exception:
+    DDGS = None
+try:
+    from selectolax.lexbor import LexborHTMLParser  # C-backed; BeautifulSoup is the fallback
+except Exception:
+    LexborHTMLParser = None
+from ._http import SESSION, canonical_url
+from ._cache import cache_get, cache_set
+from ..fallbacks import circuit_broken
 
 HTTP_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "15"))
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 SERP_API_KEY   = os.getenv("SERP_API_KEY")
 NEWSAPI_KEY    = os.getenv("NEWSAPI_KEY")
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "16"))
+SEARCH_TTL     = int(os.getenv("SEARCH_TTL", "900"))
+# market modifiers mixed into query expansion (configurable, parsed once)
+_MODIFIERS = tuple(m.strip() for m in os.getenv(
+    "QUERY_EXPANSION_MODIFIERS", "market size; vendors; tooling; spec; roadmap; 2024; 2025; news; open-source"
+).split(";") if m.strip())
+CIRCUIT_BREAKER_LIMIT    = int(os.getenv("CIRCUIT_BREAKER_LIMIT", "3"))
+CIRCUIT_BREAKER_COOLDOWN = float(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "60"))
 
 # ---------- Utilities ----------
+_WS_RE = re.compile(r"\s+")
+_SPLIT_RE = re.compile(r"[,/|]+")
+
 def _norm(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip().lower()
+    return _WS_RE.sub(" ", (s or "")).strip().lower()
+
+def _ttl_cached(fn):
+    """Reuse a provider's non-empty results for SEARCH_TTL seconds, keyed on (provider, query, max_results)."""
+    sig = inspect.signature(fn)
+    @wraps(fn)
+    def wrapper(*args, **kwargs) -> List[Dict]:
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        a = bound.arguments
+        key = f"{fn.__name__}\x00{_norm(a['query'])}\x00{a['max_results']}"
+        hit = cache_get("search", key, SEARCH_TTL)
+        if hit is not None:
+            return orjson.loads(hit)
+        res = fn(*bound.args, **bound.kwargs)
+        if res:
+            cache_set("search", key, orjson.dumps(res).decode())
+        return res
+    return wrapper
+
+def _fingerprint(key: str) -> int:
+    """64-bit int for a dedup key; ints hash and compare cheaper than (title, url) string tuples."""
+    return _xxh3(key.encode("utf-8", "replace")) if _xxh3 else hash(key)
+
+class _Deduper:
+    """Online _dedup: feed result batches in priority order; add() returns True once max_results are kept."""
+    def __init__(self, max_results: int):
+        self.max_results = max_results
+        self.seen: set[int] = set()
+        self.out: List[Dict] = []
+
+    def add(self, items: List[Dict]) -> bool:
+        for it in items:
+            if len(self.out) >= self.max_results:
+                break
+            url = (it.get("url") or "").strip()
+            if not url:
+                continue
+            # canonical form: tracking/ordering variants of one page collapse, and url2md's cache sees one key
+            url = canonical_url(url)
+            key = _fingerprint(f"{_norm(it.get('title',''))[:120]}\x00{url.casefold()}")
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            self.out.append({**it, "url": url})
+        return len(self.out) >= self.max_results
 
 def _dedup(items: List[Dict], max_results: int) -> List[Dict]:
-    seen = set()
-    out = []
-    for it in items:
-        url = (it.get("url") or "").strip()
-        if not url:
-            continue
-        key = (_norm(it.get("title",""))[:120], url.lower())
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(it)
-        if len(out) >= max_results:
-            break
-    return out
+    d = _Deduper(max_results)
+    d.add(items)
+    return d.out
 
-def expand_queries(topic: str) -> List[str]:
-    """Generic expansion: quoted/unquoted, plus mix-in of common market modifiers."""
+@lru_cache(maxsize=256)
+def expand_queries(topic: str) -> Tuple[str, ...]:
+    """Generic expansion: quoted/unquoted, plus mix-in of common market modifiers (memoized; tuple so it's shareable)."""
     t = topic.strip()
     if not t:
-        return []
+        return ()
     base = [_norm(t)]
     # quoted version
     if " " in t:
         base.append(f"\"{t}\"")
     # split by commas/slashes and join variants
-    parts = re.split(r"[,/|]+", t)
+    parts = _SPLIT_RE.split(t)
     parts = [p.strip() for p in parts if p.strip()]
     if len(parts) > 1:
         base.append(" ".join(parts))
-    # market modifiers (configurable)
-    mod_env = os.getenv("QUERY_EXPANSION_MODIFIERS", "market size; vendors; tooling; spec; roadmap; 2024; 2025; news; open-source")
-    modifiers = [m.strip() for m in mod_env.split(";") if m.strip()]
-    for m in modifiers:
+    for m in _MODIFIERS:
         base.append(f"{t} {m}")
     # unique + cap
     uniq = []
@@ -55,9 +115,10 @@ def expand_queries(topic: str) -> List[str]:
         if nq not in seen:
             uniq.append(q)
             seen.add(nq)
-    return uniq[:8]
+    return tuple(uniq[:8])
 
 # ---------- Providers ----------
+@_ttl_cached
 def tavily_search(query: str, max_results: int = 10) -> List[Dict]:
     if not TAVILY_API_KEY:
         return []
@@ -71,9 +132,9 @@ def tavily_search(query: str, max_results: int = 10) -> List[Dict]:
         "include_raw_content": False,
         "topic": "general",
     }
-    r = requests.post(url, json=payload, timeout=HTTP_TIMEOUT)
+    r = SESSION.post(url, json=payload, timeout=HTTP_TIMEOUT)
     r.raise_for_status()
-    data = r.json() or {}
+    data = orjson.loads(r.content) or {}
     out = []
     for res in (data.get("results") or [])[:max_results]:
         out.append({
@@ -86,14 +147,15 @@ def tavily_search(query: str, max_results: int = 10) -> List[Dict]:
         })
     return out
 
+@_ttl_cached
 def serp_search(query: str, max_results: int = 10) -> List[Dict]:
     if not SERP_API_KEY:
         return []
     url = "https://serpapi.com/search.json"
     params = {"engine":"google","q":query,"num":max_results,"api_key":SERP_API_KEY,"hl":"en"}
-    r = requests.get(url, params=params, timeout=HTTP_TIMEOUT)
+    r = SESSION.get(url, params=params, timeout=HTTP_TIMEOUT)
     r.raise_for_status()
-    data = r.json() or {}
+    data = orjson.loads(r.content) or {}
     out = []
     for item in (data.get("organic_results") or [])[:max_results]:
         out.append({
@@ -105,14 +167,15 @@ def serp_search(query: str, max_results: int = 10) -> List[Dict]:
         })
     return out
 
+@_ttl_cached
 def newsapi_search(query: str, max_results: int = 10) -> List[Dict]:
     if not NEWSAPI_KEY:
         return []
     url = "https://newsapi.org/v2/everything"
     params = {"q": query, "pageSize": max_results, "language": "en", "sortBy": "relevancy", "apiKey": NEWSAPI_KEY}
-    r = requests.get(url, params=params, timeout=HTTP_TIMEOUT)
+    r = SESSION.get(url, params=params, timeout=HTTP_TIMEOUT)
     r.raise_for_status()
-    data = r.json() or {}
+    data = orjson.loads(r.content) or {}
     out = []
     for a in (data.get("articles") or [])[:max_results]:
         out.append({
@@ -125,52 +188,48 @@ def newsapi_search(query: str, max_results: int = 10) -> List[Dict]:
         })
     return out
 
+@_ttl_cached
 def ddg_api_search(query: str, max_results: int = 10) -> List[Dict]:
-    try:
-        from ddgs  import DDGS
-    except Exception:
-        return []
-    try:
-        out = []
-        with DDGS() as ddgs:
-            for r in ddgs.text(query, max_results=max_results):
-                out.append({
-                    "title": r.get("title",""),
-                    "url": r.get("href",""),
-                    "description": r.get("body",""),
-                    "source": "ddg",
-                    "is_stub": False
-                })
-        return out
-    except Exception:
+    if DDGS is None:
         return []
+    out = []
+    with DDGS() as ddgs:
+        for r in ddgs.text(query, max_results=max_results):
+            out.append({
+                "title": r.get("title",""),
+                "url": r.get("href",""),
+                "description": r.get("body",""),
+                "source": "ddg",
+                "is_stub": False
+            })
+    return out
 
+@_ttl_cached
 def ddg_html_search(query: str, max_results: int = 10) -> List[Dict]:
     """HTML fallback that often works when the python package is blocked."""
-    try:
-        qs = urlencode({"q": query})
-        url = f"https://duckduckgo.com/html/?{qs}"
-        r = requests.get(url, timeout=HTTP_TIMEOUT, headers={"User-Agent":"Mozilla/5.0"})
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "lxml")
-        out = []
-        for res in soup.select("a.result__a"):
-            href = res.get("href")
-            title = res.get_text(strip=True)
-            if href and title:
-                out.append({"title": title, "url": href, "description": "", "source":"ddg_html", "is_stub": False})
-                if len(out) >= max_results:
-                    break
-        return out
-    except Exception:
-        return []
+    qs = urlencode({"q": query})
+    url = f"https://duckduckgo.com/html/?{qs}"
+    r = SESSION.get(url, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    if LexborHTMLParser is not None:
+        anchors = ((a.attributes.get("href"), a.text(strip=True)) for a in LexborHTMLParser(r.text).css("a.result__a"))
+    else:
+        anchors = ((a.get("href"), a.get_text(strip=True)) for a in BeautifulSoup(r.text, "lxml").select("a.result__a"))
+    out = []
+    for href, title in anchors:
+        if href and title:
+            out.append({"title": title, "url": href, "description": "", "source":"ddg_html", "is_stub": False})
+            if len(out) >= max_results:
+                break
+    return out
 
+@_ttl_cached
 def wikipedia_search(query: str, max_results: int = 6) -> List[Dict]:
     api = "https://en.wikipedia.org/w/api.php"
     params = {"action":"opensearch","search":query,"limit":max_results,"namespace":0,"format":"json"}
-    r = requests.get(api, params=params, timeout=HTTP_TIMEOUT)
+    r = SESSION.get(api, params=params, timeout=HTTP_TIMEOUT)
     r.raise_for_status()
-    data = r.json()
+    data = orjson.loads(r.content)
     titles, descs, urls = data[1], data[2], data[3]
     out = []
     for t, d, u in zip(titles, descs, urls):
@@ -178,26 +237,105 @@ def wikipedia_search(query: str, max_results: int = 6) -> List[Dict]:
     return out
 
 # ---------- Aggregate across expansions ----------
+# Priority: Tavily → Serp → News → DDG API → DDG HTML → Wikipedia; providers that
+# can't run here (no key / package) are dropped once at import instead of returning [] per call
+_SEARCH_PROVIDERS = tuple(fn for fn, ok in [
+    (tavily_search, bool(TAVILY_API_KEY)), (serp_search, bool(SERP_API_KEY)), (newsapi_search, bool(NEWSAPI_KEY)),
+    (ddg_api_search, DDGS is not None), (ddg_html_search, True), (wikipedia_search, True),
+] if ok)
+
+# provider name -> {"fails": consecutive failures, "open_until": monotonic deadline}
+_BREAKER: Dict[str, Dict[str, float]] = {}
+_BREAKER_LOCK = threading.Lock()
+
+def _breaker_open(name: str) -> bool:
+    """Skip a provider after CIRCUIT_BREAKER_LIMIT straight failures; one probe call is let through after the cooldown."""
+    with _BREAKER_LOCK:
+        st = _BREAKER.get(name)
+        if not st or not circuit_broken(int(st["fails"]), CIRCUIT_BREAKER_LIMIT):
+            return False
+        now = time.monotonic()
+        if now < st["open_until"]:
+            return True
+        # half-open: this caller is the probe; everyone else stays blocked until it reports back
+        st["open_until"] = now + CIRCUIT_BREAKER_COOLDOWN
+        return False
+
+def _breaker_record(name: str, ok: bool) -> None:
+    with _BREAKER_LOCK:
+        st = _BREAKER.setdefault(name, {"fails": 0, "open_until": 0.0})
+        st["fails"] = 0 if ok else st["fails"] + 1
+        if not ok and circuit_broken(int(st["fails"]), CIRCUIT_BREAKER_LIMIT):
+            st["open_until"] = time.monotonic() + CIRCUIT_BREAKER_COOLDOWN
+
 def aggregate_search(topic: str, max_results: int = 12) -> List[Dict]:
     queries = expand_queries(topic)
-    collected: List[Dict] = []
-
-    # Priority: Tavily → Serp → News → DDG API → DDG HTML → Wikipedia
-    providers = [tavily_search, serp_search, newsapi_search, ddg_api_search, ddg_html_search, wikipedia_search]
-
-    for q in queries:
-        for fn in providers:
-            try:
-                res = fn(q, max_results=6)
-                if res:
-                    collected.extend(res)
-            except Exception:
-                continue
+    dedup = _Deduper(max_results)
+
+    def call(job) -> List[Dict]:
+        q, fn = job
+        if _breaker_open(fn.__name__):
+            return []
+        try:
+            res = fn(q, max_results=6) or []
+        except Exception:
+            _breaker_record(fn.__name__, ok=False)
+            return []
+        _breaker_record(fn.__name__, ok=True)
+        return res
+
+    # every (query, provider) call is independent network I/O, so run them together; results are
+    # consumed in query-then-provider order, so dedup still prefers higher-priority providers
+    jobs = [(q, fn) for q in queries for fn in _SEARCH_PROVIDERS]
+    with ThreadPoolExecutor(max_workers=max(1, min(SEARCH_WORKERS, len(jobs) or 1))) as ex:
+        futures = [ex.submit(call, job) for job in jobs]
+        for i, fut in enumerate(futures):
+            if dedup.add(fut.result()):
+                # budget filled: calls that haven't started yet are dropped
+                for rest in futures[i+1:]:
+                    rest.cancel()
+                break
+    return dedup.out
+
+# ---------- “Enrichment” ----------
+_EN_WIKI_HOSTS = frozenset({"en.wikipedia.org", "en.m.wikipedia.org"})
 
-    # Deduplicate and cap
-    return _dedup(collected, max_results=max_results)
+def _wiki_title(url: str) -> str:
+    """Article title for English Wikipedia URLs only (extracts come from the en API); '' otherwise."""
+    u = urlparse(url)
+    if (u.hostname or "").lower() not in _EN_WIKI_HOSTS or not u.path.startswith("/wiki/"):
+        return ""
+    return unquote(u.path[len("/wiki/"):]).replace("_", " ").strip()
+
+def wikipedia_extracts(titles: List[str]) -> Dict[str, str]:
+    """Plain-text intro extracts keyed by lowercased title, 20 titles per API call (the TextExtracts cap)."""
+    api = "https://en.wikipedia.org/w/api.php"
+    out: Dict[str, str] = {}
+    for i in range(0, len(titles), 20):
+        batch = titles[i:i+20]
+        params = {"action":"query","prop":"extracts","exintro":1,"explaintext":1,"exlimit":len(batch),
+                  "redirects":1,"titles":"|".join(batch),"format":"json"}
+        try:
+            r = SESSION.get(api, params=params, timeout=HTTP_TIMEOUT)
+            r.raise_for_status()
+            q = orjson.loads(r.content).get("query", {})
+        except Exception:
+            continue
+        # follow normalization/redirect hops back to the title we asked for
+        alias = {}
+        for hop in q.get("normalized", []) + q.get("redirects", []):
+            alias[hop["to"]] = alias.get(hop["from"], hop["from"])
+        for page in q.get("pages", {}).values():
+            title, text = page.get("title", ""), page.get("extract") or ""
+            if text.strip():
+                out[alias.get(title, title).lower()] = text
+                out[title.lower()] = text
+    return out
 
-# ---------- “Enrichment” placeholder ----------
 def enrich_with_content(results: List[Dict]) -> List[Dict]:
-    """We keep descriptions; full content extraction happens later in url2md."""
-    return [{**r, "content": r.get("description","")} for r in results]
+    """Wikipedia hits get their intro in one batched API call; the rest keep descriptions for url2md later."""
+    titles = {r.get("url",""): _wiki_title(r.get("url","")) for r in results}
+    wanted = list(dict.fromkeys(t for t in titles.values() if t))
+    extracts = wikipedia_extracts(wanted) if wanted else {}
+    return [{**r, "content": extracts.get(titles[r.get("url","")].lower()) or r.get("description","")}
+            for r in results]
@@ -1,5 +1,13 @@
-import os, requests
+import os, requests, orjson
 from html import unescape
+from concurrent.futures import ThreadPoolExecutor
+from ._http import SESSION, H2_CLIENT, canonical_url
+from ._cache import cache_get, cache_set, PAGE_CACHE_TTL
+from ..fallbacks import with_retries, retryable_status
+try:
+    import trafilatura  # main-content extraction; markdownify stays as the fallback
+except Exception:
+    trafilatura = None
 try:
     from markdownify import markdownify as _to_md
 except Exception:
@@ -11,15 +19,21 @@ URL2MD_BASE    = os.getenv("URL2MD_BASE") or "https://url-to-markdown-api.p.rapi
 URL2MD_ENDPOINT= os.getenv("URL2MD_ENDPOINT") or "/convert"
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 HTTP_TIMEOUT   = int(os.getenv("HTTP_TIMEOUT","15"))
+# RapidAPI/Tavily Extract get one request per source, concurrently: multiplex them when HTTP/2 is available
+_API = H2_CLIENT or SESSION
+JINA_CACHE_TTL = int(os.getenv("JINA_CACHE_TTL","86400"))
+VALIDATOR_TTL  = int(os.getenv("VALIDATOR_TTL", str(30 * 86400)))
 
 def _rapidapi_convert(url: str) -> str:
     if not RAPIDAPI_KEY: raise RuntimeError("No RAPIDAPI_KEY")
     endpoint = f"{URL2MD_BASE}{URL2MD_ENDPOINT}"
     headers = {"x-rapidapi-key": RAPIDAPI_KEY, "x-rapidapi-host": URL2MD_HOST, "Content-Type": "application/json"}
     payload = {"url": url, "returnType": "markdown"}
-    r = requests.post(endpoint, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
+    r = _API.post(endpoint, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
     r.raise_for_status()
-    data = r.json()
+    if r.content.lstrip()[:1] not in (b'"', b"{", b"["):
+        return r.text  # plain markdown body: nothing to decode
+    data = orjson.loads(r.content)
     if isinstance(data, dict) and "markdown" in data: return data["markdown"]
     if isinstance(data, str): return data
     return str(data)
@@ -28,37 +42,113 @@ def _tavily_extract(url: str) -> str:
     if not TAVILY_API_KEY: return ""
     endpoint = "https://api.tavily.com/extract"
     payload = {"api_key": TAVILY_API_KEY, "url": url}
-    r = requests.post(endpoint, json=payload, timeout=HTTP_TIMEOUT)
+    r = _API.post(endpoint, json=payload, timeout=HTTP_TIMEOUT)
     if r.status_code >= 400: return ""
-    data = r.json()
+    data = orjson.loads(r.content)
     title = data.get("title") or url
     text  = data.get("content") or ""
     return f"# {title}\n\n{text}"
 
-def _jina_reader(url: str) -> str:
+def _jina_get(endpoint: str, timeout: int) -> requests.Response:
+    r = SESSION.get(endpoint, timeout=timeout)
+    r.raise_for_status()
+    return r
+
+# r.jina.ai rate-limits Streamlit Cloud's shared IPs; back off with jitter instead of dropping the source.
+# Status codes only: connection errors are already retried by SESSION's adapter.
+_jina_get = with_retries(_jina_get, attempts=3, base_sleep=0.3, max_total=5.0, retry_on=retryable_status)
+
+def _jina_reader(url: str, timeout: int = None, ttl_seconds: int = JINA_CACHE_TTL) -> str:
+    # ttl_seconds=0 bypasses the disk cache (e.g. fresh-news topics)
+    key = canonical_url(url)
+    cached = cache_get("jina", key, ttl_seconds)
+    if cached is not None:
+        return cached
     try:
-        r = requests.get(f"https://r.jina.ai/http://{url.split('://',1)[-1]}", timeout=HTTP_TIMEOUT)
-        if r.status_code < 400 and r.text.strip():
+        r = _jina_get("https://r.jina.ai/http://" + (url.partition("://")[2] or url), timeout or HTTP_TIMEOUT)
+        if r.text.strip():
+            cache_set("jina", key, r.text)
             return r.text
     except Exception:
         pass
     return ""
 
 def url_to_markdown(url: str, timeout: int = None) -> str:
-    # Priority: RapidAPI → Tavily Extract → Jina → local markdownify
-    try:
-        return _rapidapi_convert(url)
-    except Exception:
-        pass
-    md = _tavily_extract(url)
-    if md: return md
-    md = _jina_reader(url)
-    if md: return md
+    key = canonical_url(url)
+    cached = cache_get("url2md", key, PAGE_CACHE_TTL)
+    if cached is not None:
+        return cached
+    md = _convert(url, timeout)
+    if md.strip() and not md.startswith("# Unable to convert"):
+        cache_set("url2md", key, md)
+    return md
+
+def fetch_many(fetch, urls: list[str], concurrency: int = 16) -> list[str]:
+    """Run fetch(url) in a bounded thread pool, in input order; duplicate URLs (by canonical_url) are fetched once."""
+    unique: dict[str, str] = {}
+    for u in urls:
+        unique.setdefault(canonical_url(u), u)
+    if not unique:
+        return []
+    # network-bound: requests releases the GIL on socket I/O, so threads overlap the waits
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(unique)))) as ex:
+        got = dict(zip(unique, ex.map(fetch, unique.values())))
+    return [got[canonical_url(u)] for u in urls]
+
+def urls_to_markdown(urls: list[str], concurrency: int = 16, timeout: int = None) -> list[str]:
+    """url_to_markdown over many URLs via fetch_many; '' for a URL whose conversion raised."""
+    def one(u: str) -> str:
+        try:
+            return url_to_markdown(u, timeout)
+        except Exception:
+            return ""
+    return fetch_many(one, urls, concurrency)
+
+def _convert(url: str, timeout: int = None) -> str:
+    # Priority: RapidAPI → Tavily Extract → Jina → local markdownify (always last)
+    for fn in _ACTIVE_CONVERTERS:
+        try:
+            md = fn(url)
+        except Exception:
+            continue
+        if md and md.strip():
+            return md
+    return _local_markdownify(url, timeout)
+
+def _html_to_md(html: str, url: str) -> str:
+    """Main content only (no nav/footer/ads) when trafilatura finds it; else the whole page via markdownify."""
+    if trafilatura is not None:
+        try:
+            md = trafilatura.extract(html, url=url, output_format="markdown", include_links=True)
+            if md and md.strip():
+                return md
+        except Exception:
+            pass
+    return _to_md(html, heading_style="ATX") if _to_md else unescape(html)
+
+def _local_markdownify(url: str, timeout: int = None) -> str:
+    """Fetch + markdownify. Remembers ETag/Last-Modified so a later refetch can be answered with a bodiless 304."""
+    key = canonical_url(url)
+    prev = cache_get("validators", key, VALIDATOR_TTL)
+    prev = orjson.loads(prev) if prev else None
+    headers = {"User-Agent":"Mozilla/5.0 (MarketBriefBot/1.0)"}
+    if prev and prev.get("etag"): headers["If-None-Match"] = prev["etag"]
+    if prev and prev.get("last_modified"): headers["If-Modified-Since"] = prev["last_modified"]
     try:
-        resp = requests.get(url, headers={"User-Agent":"Mozilla/5.0 (MarketBriefBot/1.0)"}, timeout=timeout or HTTP_TIMEOUT)
+        resp = SESSION.get(url, headers=headers, timeout=timeout or HTTP_TIMEOUT)
+        if resp.status_code == 304 and prev:
+            return prev["md"]
         resp.raise_for_status()
         html = resp.text
-        if _to_md: return _to_md(html, heading_style="ATX")
-        return unescape(html)
+        md = _html_to_md(html, url)
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if (etag or last_modified) and md.strip():
+            cache_set("validators", key, orjson.dumps({"etag": etag, "last_modified": last_modified, "md": md}).decode())
+        return md
     except Exception:
         return f"# Unable to convert\n\nFailed to fetch/convert: {url}\n"
+
+# converters whose credentials are missing can never succeed; drop them once at import
+_ACTIVE_CONVERTERS = tuple(fn for fn, ok in [
+    (_rapidapi_convert, bool(RAPIDAPI_KEY)), (_tavily_extract, bool(TAVILY_API_KEY)), (_jina_reader, True),
+] if ok)